@@ -4,14 +4,155 @@ Uses official VNC client applications via command line interface
 """
 
 import subprocess
-import sys
 import os
 import platform
 import shutil
-import glob
-from threading import Thread
+import fnmatch
+import re
+import select
+from threading import Thread, Event
+from types import MappingProxyType
 import time
 
+# The OS never changes while we run, so resolve it once
+_SYSTEM = platform.system()
+
+# Windows-only window management used for fullscreen mode, imported once up front
+_HAS_WIN_GUI = False
+if _SYSTEM == "Windows":
+    try:
+        import win32con
+        import win32gui
+        from pywinauto.application import Application
+        _HAS_WIN_GUI = True
+    except ImportError:
+        pass
+
+# Windows VNC clients in order of preference (TigerVNC first).
+# 'args' and 'env_vars' are built per connection from (connection_string, username, password).
+_WINDOWS_CLIENTS = MappingProxyType({
+    'tigervnc': {
+        'name': 'TigerVNC Viewer',
+        'executable': 'vncviewer*.exe',  # Pattern for search
+        'search_patterns': (
+            'vncviewer64-*.*.*.exe',
+            'vncviewer-*.*.*.exe',
+            '**/vncviewer64-*.*.*.exe',
+            '**/vncviewer-*.*.*.exe'
+        ),
+        'args': lambda connection_string, username, password: (connection_string,),
+        'supports_password': True,  # Via environment variables
+        'auth_method': 'env_vars',
+        'env_vars': lambda username, password: {
+            'VNC_USERNAME': username,
+            'VNC_PASSWORD': password
+        }
+    },
+    'tightvnc': {
+        'name': 'TightVNC Viewer',
+        'executable': 'tvnviewer.exe',
+        'locations': (
+            'C:\\Program Files\\TightVNC\\tvnviewer.exe',
+            'C:\\Program Files (x86)\\TightVNC\\tvnviewer.exe'
+        ),
+        'args': lambda connection_string, username, password:
+            ('-host', connection_string) + (('-password', password) if password else ()),
+        'supports_password': True,
+        'auth_method': 'cli_param'
+    },
+    'realvnc': {
+        'name': 'RealVNC Viewer',
+        'executable': 'vncviewer.exe',
+        'locations': (
+            'C:\\Program Files\\RealVNC\\VNC Viewer\\vncviewer.exe',
+            'C:\\Program Files (x86)\\RealVNC\\VNC Viewer\\vncviewer.exe'
+        ),
+        'args': lambda connection_string, username, password: (connection_string,),
+        'supports_password': False,  # RealVNC CLI doesn't support password parameter
+        'auth_method': 'manual'
+    },
+    'ultravnc': {
+        'name': 'UltraVNC',
+        'executable': 'vncviewer.exe',
+        'locations': (
+            'C:\\Program Files\\uvnc bvba\\UltraVNC\\vncviewer.exe',
+            'C:\\Program Files (x86)\\uvnc bvba\\UltraVNC\\vncviewer.exe',
+            'C:\\Program Files\\UltraVNC\\vncviewer.exe',  # Legacy path
+            'C:\\Program Files (x86)\\UltraVNC\\vncviewer.exe'  # Legacy path
+        ),
+        'args': lambda connection_string, username, password:
+            (connection_string,) + (('-password', password) if password else ()),
+        'supports_password': True,
+        'auth_method': 'cli_param'
+    }
+})
+
+# Linux VNC clients in order of preference
+_LINUX_CLIENTS = MappingProxyType({
+    'remmina': {
+        'name': 'Remmina',
+        'executable': 'remmina',
+        'args': lambda connection_string, username, password: ('-c', f'vnc://{connection_string}'),
+        'supports_password': True,
+        'auth_method': 'url_based'
+    },
+    'tigervnc': {
+        'name': 'TigerVNC Viewer',
+        'executable': 'vncviewer',
+        'args': lambda connection_string, username, password: (connection_string,),
+        'supports_password': True,
+        'auth_method': 'env_vars',
+        'env_vars': lambda username, password: {
+            'VNC_USERNAME': username,
+            'VNC_PASSWORD': password
+        }
+    },
+    'vinagre': {
+        'name': 'Vinagre',
+        'executable': 'vinagre',
+        'args': lambda connection_string, username, password: (f'vnc://{connection_string}',),
+        'supports_password': True,
+        'auth_method': 'url_based'
+    }
+})
+
+
+# Resolved client executable paths keyed by search inputs, as (path or None, expiry).
+# Found paths are kept for good; misses expire so a viewer installed later is noticed.
+_CLIENT_PATH_CACHE = {}
+_MISS_TTL = 30.0
+
+# How much of a client's stderr is kept for the "failed to start" message
+_STDERR_HEAD_LIMIT = 4096
+
+
+def _cached_lookup(key, lookup):
+    """Return lookup()'s path for key, reusing a found path or a recent miss."""
+    cached = _CLIENT_PATH_CACHE.get(key)
+    if cached is not None:
+        path, expires = cached
+        if path is not None or time.monotonic() < expires:
+            return path
+    path = lookup()
+    _CLIENT_PATH_CACHE[key] = (path, time.monotonic() + _MISS_TTL)
+    return path
+
+
+def _resolve_executable(executable, locations=()):
+    """Find executable in PATH or in one of the given locations, caching the result."""
+    def lookup():
+        if shutil.which(executable):
+            return executable
+        return next((location for location in locations if os.path.isfile(location)), None)
+
+    return _cached_lookup((executable, locations), lookup)
+
+
+def invalidate_client_cache():
+    """Forget resolved client paths, e.g. after a VNC client is installed or removed."""
+    _CLIENT_PATH_CACHE.clear()
+
+
 class CLIVNCConnector:
     def __init__(self):
         self.vnc_process = None
@@ -20,7 +161,10 @@ class CLIVNCConnector:
         self.port = None
         self.selected_client = None
         self.client_executable = None
+        self.client_env_vars = None
         self.fullscreen_mode = False
+        self._exited = Event()  # Set by the monitor thread once the client process exits
+        self._exited.set()
 
     def connect(self, host, port, username, password=None, selected_client=None, fullscreen=False):
         """Connect to VNC server using selected VNC client."""
@@ -42,44 +186,53 @@ class CLIVNCConnector:
 
             print(f"Starting VNC client: {' '.join(vnc_command[:3])}...")
 
-            # Prepare environment variables if needed
-            env = os.environ.copy()
-            if hasattr(self, 'client_env_vars') and self.client_env_vars:
+            # Prepare environment variables if needed; env=None lets the child inherit ours as-is
+            env = None
+            if self.client_env_vars:
+                env = os.environ.copy()
                 env.update(self.client_env_vars)
                 print(f"  Using environment variables: {list(self.client_env_vars.keys())}")
 
-            # Start VNC client in background
+            # Start VNC client in background. stderr is piped so a failed start can be
+            # explained; a drain thread keeps the first few KB and discards the rest, so
+            # a long session's warnings neither block the viewer nor pile up
             self.vnc_process = subprocess.Popen(
                 vnc_command,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
                 env=env,
-                creationflags=subprocess.CREATE_NEW_CONSOLE if platform.system() == 'Windows' else 0
+                creationflags=subprocess.CREATE_NEW_CONSOLE if _SYSTEM == 'Windows' else 0
             )
-
-            # Give VNC client time to start
-            time.sleep(2)
-
-            # Check if process is still running
-            if self.vnc_process.poll() is None:
+            self._exited = Event()
+            stderr_head = bytearray()
+            stderr_thread = Thread(target=self._drain_stderr, name='vnc-stderr',
+                                   args=(self.vnc_process.stderr, stderr_head), daemon=True)
+            stderr_thread.start()
+
+            # Give VNC client time to start, but bail out as soon as it exits
+            if not self._wait_for_exit(self.vnc_process, 2.0):
                 self.connected = True
                 print("SUCCESS: VNC client started successfully")
 
                 # Apply fullscreen modifications if requested (Windows only)
-                if self.fullscreen_mode and platform.system() == "Windows":
-                    fullscreen_thread = Thread(target=self._apply_fullscreen_modifications, daemon=True)
+                if self.fullscreen_mode and _SYSTEM == "Windows":
+                    fullscreen_thread = Thread(target=self._apply_fullscreen_modifications,
+                                               name='vnc-fullscreen', daemon=True)
                     fullscreen_thread.start()
 
                 # Monitor VNC client in background
-                monitor_thread = Thread(target=self._monitor_vnc_client, daemon=True)
+                monitor_thread = Thread(target=self._monitor_vnc_client, name='vnc-monitor',
+                                        args=(self.vnc_process, self._exited), daemon=True)
                 monitor_thread.start()
 
                 return True
             else:
-                print("ERROR: VNC client failed to start")
-                stdout, stderr = self.vnc_process.communicate()
-                if stderr:
-                    print(f"Error: {stderr.decode().strip()}")
+                print(f"ERROR: VNC client failed to start (exit code {self.vnc_process.returncode})")
+                self._exited.set()
+                stderr_thread.join(1.0)  # A forked helper may still hold the pipe open
+                stderr_output = bytes(stderr_head).decode(errors='replace').strip()
+                if stderr_output:
+                    print(f"  VNC client output: {stderr_output}")
                 return False
 
         except Exception as e:
@@ -88,8 +241,6 @@ class CLIVNCConnector:
 
     def _get_vnc_command(self, host, port, username, password, selected_client=None):
         """Get appropriate VNC client command based on selection or platform detection."""
-        system = platform.system()
-
         # Construct connection string
         connection_string = f"{host}:{port}"
         if port == 5900:
@@ -98,124 +249,98 @@ class CLIVNCConnector:
             display_num = port - 5900
             connection_string = f"{host}:{display_num}"
 
-        if system == "Windows":
+        if _SYSTEM == "Windows":
             return self._get_windows_vnc_command(connection_string, username, password, selected_client)
-        elif system == "Darwin":  # macOS
+        elif _SYSTEM == "Darwin":  # macOS
             return self._get_macos_vnc_command(connection_string, username, password, selected_client)
         else:  # Linux and others
             return self._get_linux_vnc_command(connection_string, username, password, selected_client)
 
     def _get_windows_vnc_command(self, connection_string, username, password, selected_client=None):
         """Get VNC command for Windows."""
-        # Define available Windows VNC clients
-        clients = {
-            'tightvnc': {
-                'name': 'TightVNC Viewer',
-                'executable': 'tvnviewer.exe',
-                'locations': [
-                    'C:\\Program Files\\TightVNC\\tvnviewer.exe',
-                    'C:\\Program Files (x86)\\TightVNC\\tvnviewer.exe'
-                ],
-                'args': ['-host', connection_string] + (['-password', password] if password else []),
-                'supports_password': True,
-                'auth_method': 'cli_param'
-            },
-            'realvnc': {
-                'name': 'RealVNC Viewer',
-                'executable': 'vncviewer.exe',
-                'locations': [
-                    'C:\\Program Files\\RealVNC\\VNC Viewer\\vncviewer.exe',
-                    'C:\\Program Files (x86)\\RealVNC\\VNC Viewer\\vncviewer.exe'
-                ],
-                'args': [connection_string],
-                'supports_password': False,  # RealVNC CLI doesn't support password parameter
-                'auth_method': 'manual'
-            },
-            'tigervnc': {
-                'name': 'TigerVNC Viewer',
-                'executable': 'vncviewer*.exe',  # Pattern for search
-                'locations': [],  # Will be populated dynamically
-                'search_patterns': [
-                    'vncviewer64-*.*.*.exe',
-                    'vncviewer-*.*.*.exe',
-                    '**/vncviewer64-*.*.*.exe',
-                    '**/vncviewer-*.*.*.exe'
-                ],
-                'args': [connection_string],
-                'supports_password': True,  # Via environment variables
-                'auth_method': 'env_vars',
-                'env_vars': {
-                    'VNC_USERNAME': username,
-                    'VNC_PASSWORD': password
-                }
-            },
-            'ultravnc': {
-                'name': 'UltraVNC',
-                'executable': 'vncviewer.exe',
-                'locations': [
-                    'C:\\Program Files\\uvnc bvba\\UltraVNC\\vncviewer.exe',
-                    'C:\\Program Files (x86)\\uvnc bvba\\UltraVNC\\vncviewer.exe',
-                    'C:\\Program Files\\UltraVNC\\vncviewer.exe',  # Legacy path
-                    'C:\\Program Files (x86)\\UltraVNC\\vncviewer.exe'  # Legacy path
-                ],
-                'args': [connection_string] + (['-password', password] if password else []),
-                'supports_password': True,
-                'auth_method': 'cli_param'
-            }
-        }
-
         # If specific client selected, try only that one
-        if selected_client and selected_client in clients:
-            client = clients[selected_client]
-            return self._try_client(client)
+        if selected_client and selected_client in _WINDOWS_CLIENTS:
+            client = _WINDOWS_CLIENTS[selected_client]
+            return self._try_client(client, connection_string, username, password)
 
         # Otherwise try all clients in order of preference (TigerVNC first)
-        for client_key in ['tigervnc', 'tightvnc', 'realvnc', 'ultravnc']:
-            client = clients[client_key]
-            result = self._try_client(client)
+        for client in _WINDOWS_CLIENTS.values():
+            result = self._try_client(client, connection_string, username, password)
             if result:
                 return result
 
         return None
 
-    def _try_client(self, client):
-        """Try to find and use a specific VNC client."""
-        executable_path = None
-
+    def _find_client_executable(self, client):
+        """Locate a VNC client's executable, or return None if it is not installed."""
         # Check if client has search patterns (for TigerVNC standalone files)
         if 'search_patterns' in client:
-            executable_path = self._find_tigervnc_executable(client['search_patterns'])
-        else:
-            # Check if executable exists in PATH
-            if shutil.which(client['executable']):
-                executable_path = client['executable']
-            else:
-                # Check specific locations
-                for location in client['locations']:
-                    if os.path.exists(location):
-                        executable_path = location
-                        break
+            return self._find_tigervnc_executable(client['search_patterns'])
+
+        # Check PATH, then specific locations
+        return _resolve_executable(client['executable'], client.get('locations', ()))
+
+    def _try_client(self, client, connection_string, username, password):
+        """Try to find and use a specific VNC client."""
+        executable_path = self._find_client_executable(client)
 
         if executable_path:
-            cmd = [executable_path] + client['args']
+            cmd = (executable_path,) + client['args'](connection_string, username, password)
             self.client_executable = os.path.basename(executable_path)
 
             # Store environment variables if client uses them
             if client.get('auth_method') == 'env_vars' and 'env_vars' in client:
-                self.client_env_vars = client['env_vars']
+                self.client_env_vars = client['env_vars'](username, password)
             else:
                 self.client_env_vars = None
 
-            return [arg for arg in cmd if arg]  # Filter empty args
+            return cmd
 
         return None
 
     def _find_tigervnc_executable(self, search_patterns):
         """Find TigerVNC standalone executable using search patterns."""
+        return _cached_lookup(search_patterns,
+                              lambda: self._search_tigervnc_executable(search_patterns))
+
+    def _search_tigervnc_executable(self, search_patterns):
+        """Search the current directory tree for a TigerVNC standalone executable."""
         try:
-            # Search in current directory and subdirectories
+            # Split patterns into top-level-only and recursive ('**/') basename regexes
+            flags = re.IGNORECASE if _SYSTEM == "Windows" else 0
+            compiled = []
             for pattern in search_patterns:
-                matches = glob.glob(pattern, recursive=True)
+                recursive = pattern.startswith('**/')
+                name_pattern = pattern[3:] if recursive else pattern
+                compiled.append((recursive, re.compile(fnmatch.translate(name_pattern), flags)))
+            any_name = re.compile('|'.join(f'(?:{rx.pattern})' for _, rx in compiled), flags)
+
+            # Walk the current directory tree once, testing each filename once
+            found = []  # (relative path, is top-level)
+            pending = ['']
+            while pending:
+                parent = pending.pop()
+                try:
+                    with os.scandir(parent or '.') as entries:
+                        for entry in entries:
+                            if entry.name.startswith('.') or entry.name == '__pycache__':
+                                continue
+                            relative_path = os.path.join(parent, entry.name)
+                            try:
+                                is_dir = entry.is_dir(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            if is_dir:
+                                pending.append(relative_path)
+                            elif any_name.match(entry.name):
+                                found.append((relative_path, not parent))
+                except OSError:
+                    continue  # Unreadable directory (e.g. access-denied junction); skip it
+
+            # Apply patterns in order of preference
+            for recursive, rx in compiled:
+                matches = [path for path, top_level in found
+                           if (recursive or top_level) and rx.match(os.path.basename(path))]
                 if matches:
                     # Return the first match, preferring 64-bit version
                     matches.sort(reverse=True)  # This puts vncviewer64- before vncviewer-
@@ -239,58 +364,21 @@ class CLIVNCConnector:
             vnc_url = f"vnc://{username}@{connection_string}"
 
         self.client_executable = "Screen Sharing"
-        return ['open', vnc_url]
+        return ('open', vnc_url)
 
     def _get_linux_vnc_command(self, connection_string, username, password, selected_client=None):
         """Get VNC command for Linux."""
-        clients = {
-            'remmina': {
-                'name': 'Remmina',
-                'executable': 'remmina',
-                'args': ['-c', f'vnc://{connection_string}'],
-                'supports_password': True,
-                'auth_method': 'url_based'
-            },
-            'tigervnc': {
-                'name': 'TigerVNC Viewer',
-                'executable': 'vncviewer',
-                'args': [connection_string],
-                'supports_password': True,
-                'auth_method': 'env_vars',
-                'env_vars': {
-                    'VNC_USERNAME': username,
-                    'VNC_PASSWORD': password
-                }
-            },
-            'vinagre': {
-                'name': 'Vinagre',
-                'executable': 'vinagre',
-                'args': [f'vnc://{connection_string}'],
-                'supports_password': True,
-                'auth_method': 'url_based'
-            }
-        }
-
-        # If specific client selected, try only that one
-        if selected_client and selected_client in clients:
-            client = clients[selected_client]
-            if shutil.which(client['executable']):
-                self.client_executable = client['executable']
-                return [client['executable']] + client['args']
+        # If specific client selected, try that one first
+        if selected_client and selected_client in _LINUX_CLIENTS:
+            result = self._try_client(_LINUX_CLIENTS[selected_client], connection_string, username, password)
+            if result:
+                return result
 
         # Otherwise try all clients in order
-        for client_key in ['remmina', 'tigervnc', 'vinagre']:
-            client = clients[client_key]
-            if shutil.which(client['executable']):
-                self.client_executable = client['executable']
-
-                # Handle environment variables for TigerVNC
-                if client.get('auth_method') == 'env_vars' and 'env_vars' in client:
-                    self.client_env_vars = client['env_vars']
-                else:
-                    self.client_env_vars = None
-
-                return [client['executable']] + client['args']
+        for client in _LINUX_CLIENTS.values():
+            result = self._try_client(client, connection_string, username, password)
+            if result:
+                return result
 
         return None
 
@@ -298,23 +386,37 @@ class CLIVNCConnector:
         """Apply fullscreen, always-on-top, and borderless modifications to VNC client window."""
         try:
             # Only run on Windows
-            if platform.system() != "Windows":
+            if _SYSTEM != "Windows":
                 print("Fullscreen modifications only supported on Windows")
                 return
 
-            # Import Windows-specific modules
-            import win32con
-            import win32gui
-            from pywinauto.application import Application
+            if not _HAS_WIN_GUI:
+                print("WARNING: pywinauto or pywin32 not installed - fullscreen mode unavailable")
+                return
 
             print("Applying fullscreen modifications to VNC client...")
-            time.sleep(3)  # Wait for VNC window to appear
 
-            # Connect to the running VNC process
-            app = Application(backend="win32").connect(process=self.vnc_process.pid)
+            # Wait for the VNC window to appear, checking often at first and backing off
+            main_window = None
+            deadline = time.monotonic() + 5
+            delay = 0.05
+            while main_window is None and time.monotonic() < deadline:
+                try:
+                    # Connect to the running VNC process and get its main window
+                    app = Application(backend="win32").connect(process=self.vnc_process.pid, timeout=0.1)
+                    window = app.top_window()
+                    if window.handle:
+                        main_window = window
+                        break
+                except Exception:
+                    pass  # Window not created yet
+                time.sleep(delay)
+                delay = min(delay * 1.5, 0.3)
+
+            if main_window is None:
+                print("Error applying fullscreen modifications: VNC window did not appear")
+                return
 
-            # Get the main window
-            main_window = app.top_window()
             hwnd = main_window.handle
 
             print(f"Found VNC window handle: {hwnd}")
@@ -337,21 +439,75 @@ class CLIVNCConnector:
 
             print("SUCCESS: VNC client window: fullscreen, always on top, no title bar!")
 
-        except ImportError:
-            print("WARNING: pywinauto or pywin32 not installed - fullscreen mode unavailable")
         except Exception as e:
             print(f"Error applying fullscreen modifications: {e}")
 
-    def _monitor_vnc_client(self):
-        """Monitor VNC client process."""
+    def _wait_for_exit(self, process, timeout):
+        """Wait up to timeout seconds for process to exit. Returns True if it exited."""
+        if process.poll() is not None:
+            return True
+
+        # Linux 5.3+: block in the kernel on a pidfd until the child exits
+        if hasattr(os, 'pidfd_open'):
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                pidfd = None  # Not supported by the kernel or already reaped
+
+            if pidfd is not None:
+                try:
+                    poller = select.poll()
+                    poller.register(pidfd, select.POLLIN)
+                    poller.poll(None if timeout is None else int(timeout * 1000))
+                finally:
+                    os.close(pidfd)
+                return process.poll() is not None
+
+        # macOS/BSD: kqueue reports NOTE_EXIT as soon as the child exits
+        if hasattr(select, 'kqueue'):
+            kq = select.kqueue()
+            try:
+                event = select.kevent(process.pid,
+                                      filter=select.KQ_FILTER_PROC,
+                                      flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                                      fflags=select.KQ_NOTE_EXIT)
+                kq.control([event], 1, timeout)
+            except OSError:
+                pass  # Process already gone
+            finally:
+                kq.close()
+            return process.poll() is not None
+
         try:
-            while self.connected and self.vnc_process:
-                # Check if process is still running
-                if self.vnc_process.poll() is not None:
-                    print("VNC client process ended")
-                    self.connected = False
+            process.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+
+    @staticmethod
+    def _drain_stderr(stream, head):
+        """Read a client's stderr until EOF, keeping only the first few KB in head."""
+        try:
+            while True:
+                chunk = stream.read1(4096)
+                if not chunk:
                     break
-                time.sleep(1)
+                if len(head) < _STDERR_HEAD_LIMIT:
+                    head += chunk[:_STDERR_HEAD_LIMIT - len(head)]
+        except (OSError, ValueError):
+            pass  # Pipe closed underneath us
+        finally:
+            stream.close()
+
+    def _monitor_vnc_client(self, process, exited):
+        """Monitor VNC client process."""
+        try:
+            # Block until the process exits; disconnect() terminates it, which also wakes us
+            self._wait_for_exit(process, None)
+            exited.set()
+            if self.connected and self.vnc_process is process:
+                print("VNC client process ended")
+                self.connected = False
         except Exception as e:
             print(f"Error monitoring VNC client: {e}")
             self.connected = False
@@ -367,9 +523,7 @@ class CLIVNCConnector:
                 self.vnc_process.terminate()
 
                 # Wait for process to end gracefully
-                try:
-                    self.vnc_process.wait(timeout=3)
-                except subprocess.TimeoutExpired:
+                if not self._wait_for_exit(self.vnc_process, 3):
                     print("Force killing VNC client process...")
                     self.vnc_process.kill()
 
@@ -377,6 +531,7 @@ class CLIVNCConnector:
                 print(f"Error terminating VNC process: {e}")
 
             self.vnc_process = None
+            self._exited.set()
 
         # Additionally, kill any remaining VNC client processes by name
         self._kill_vnc_processes()
@@ -386,146 +541,96 @@ class CLIVNCConnector:
     def _kill_vnc_processes(self):
         """Kill VNC client processes by executable name."""
         try:
-            system = platform.system()
             vnc_executables = []
 
-            if system == "Windows":
+            if _SYSTEM == "Windows":
                 vnc_executables = ['tvnviewer.exe', 'vncviewer.exe']  # Covers TigerVNC, RealVNC, UltraVNC
-            elif system == "Darwin":
+            elif _SYSTEM == "Darwin":
                 # macOS Screen Sharing doesn't need process killing
                 return
             else:  # Linux
                 vnc_executables = ['remmina', 'vncviewer', 'vinagre', 'krdc']  # vncviewer covers TigerVNC
 
-            for executable in vnc_executables:
-                if system == "Windows":
-                    # Use taskkill on Windows
-                    try:
-                        subprocess.run(['taskkill', '/F', '/IM', executable],
-                                     capture_output=True, check=False)
-                        print(f"Killed {executable} processes")
-                    except Exception as e:
-                        pass  # Silently continue if process not found
-                else:
-                    # Use pkill on Linux/Unix
-                    try:
-                        subprocess.run(['pkill', '-f', executable],
-                                     capture_output=True, check=False)
-                        print(f"Killed {executable} processes")
-                    except Exception as e:
-                        pass  # Silently continue if process not found
+            try:
+                import psutil
+            except ImportError:
+                # Fall back to the system kill tools
+                self._kill_vnc_processes_with_tools(vnc_executables)
+                return
+
+            # Match processes in-process instead of spawning one kill tool per name. The
+            # process name alone misses viewers started through a symlink or wrapper
+            # (Debian's vncviewer runs as xtigervncviewer), so the executable and argv[0]
+            # are checked as well
+            targets = frozenset(name.lower() for name in vnc_executables)
+            own_pid = os.getpid()
+            for proc in psutil.process_iter(['name', 'exe', 'cmdline']):
+                if proc.pid == own_pid:
+                    continue
+                cmdline = proc.info['cmdline']
+                candidates = (proc.info['name'], proc.info['exe'], cmdline[0] if cmdline else None)
+                name = next((os.path.basename(candidate) for candidate in candidates
+                             if candidate and os.path.basename(candidate).lower() in targets), None)
+                if name is None:
+                    continue
+                try:
+                    if _SYSTEM == "Windows":
+                        proc.kill()  # Same as taskkill /F
+                    else:
+                        proc.terminate()  # SIGTERM, same as pkill
+                    print(f"Killed {name} process {proc.pid}")
+                except psutil.Error:
+                    pass  # Process already gone or not ours to kill
 
         except Exception as e:
             print(f"Error killing VNC processes: {e}")
 
+    def _kill_vnc_processes_with_tools(self, vnc_executables):
+        """Kill VNC client processes using taskkill/pkill."""
+        kill_tool = 'taskkill' if _SYSTEM == "Windows" else 'pkill'
+        if not _resolve_executable(kill_tool):
+            return  # Don't spawn a tool that isn't installed
+
+        if _SYSTEM == "Windows":
+            # taskkill accepts several /IM filters in one invocation
+            command = ['taskkill', '/F']
+            for executable in vnc_executables:
+                command += ['/IM', executable]
+        else:
+            # pkill takes a single regex, so match all names with one alternation
+            command = ['pkill', '-f', '|'.join(re.escape(executable) for executable in vnc_executables)]
+
+        try:
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            print(f"Killed {', '.join(vnc_executables)} processes")
+        except Exception as e:
+            pass  # Silently continue if the kill tool is unavailable
+
     def is_connected(self):
         """Check if VNC client is connected."""
-        if not self.connected or not self.vnc_process:
-            return False
+        # The monitor thread flags process exit, so no waitpid() is needed here
+        return self.connected and not self._exited.is_set()
 
-        # Check if process is still running
-        if self.vnc_process.poll() is not None:
-            self.connected = False
-            return False
-
-        return True
+    def wait_exit(self, timeout=None):
+        """Block until the current VNC client process exits. Returns True if it has exited."""
+        return self._exited.wait(timeout)
 
     def get_available_clients(self):
         """Get list of available VNC clients on the system."""
-        system = platform.system()
         available = []
 
-        if system == "Windows":
-            clients = {
-                'tightvnc': {
-                    'name': 'TightVNC Viewer',
-                    'executable': 'tvnviewer.exe',
-                    'locations': [
-                        'C:\\Program Files\\TightVNC\\tvnviewer.exe',
-                        'C:\\Program Files (x86)\\TightVNC\\tvnviewer.exe'
-                    ],
-                    'supports_password': True
-                },
-                'realvnc': {
-                    'name': 'RealVNC Viewer',
-                    'executable': 'vncviewer.exe',
-                    'locations': [
-                        'C:\\Program Files\\RealVNC\\VNC Viewer\\vncviewer.exe',
-                        'C:\\Program Files (x86)\\RealVNC\\VNC Viewer\\vncviewer.exe'
-                    ],
-                    'supports_password': False
-                },
-                'tigervnc': {
-                    'name': 'TigerVNC Viewer',
-                    'executable': 'vncviewer*.exe',
-                    'search_patterns': [
-                        'vncviewer64-*.*.*.exe',
-                        'vncviewer-*.*.*.exe',
-                        '**/vncviewer64-*.*.*.exe',
-                        '**/vncviewer-*.*.*.exe'
-                    ],
-                    'supports_password': True
-                },
-                'ultravnc': {
-                    'name': 'UltraVNC',
-                    'executable': 'vncviewer.exe',
-                    'locations': [
-                        'C:\\Program Files\\uvnc bvba\\UltraVNC\\vncviewer.exe',
-                        'C:\\Program Files (x86)\\uvnc bvba\\UltraVNC\\vncviewer.exe',
-                        'C:\\Program Files\\UltraVNC\\vncviewer.exe',  # Legacy path
-                        'C:\\Program Files (x86)\\UltraVNC\\vncviewer.exe'  # Legacy path
-                    ],
-                    'supports_password': True
-                }
-            }
-
-            # Check clients in preferred order (TigerVNC first)
-            for client_id in ['tigervnc', 'tightvnc', 'realvnc', 'ultravnc']:
-                if client_id not in clients:
-                    continue
-
-                client_info = clients[client_id]
-                client_found = False
-
-                # Special handling for TigerVNC with search patterns
-                if 'search_patterns' in client_info:
-                    tigervnc_path = self._find_tigervnc_executable(client_info['search_patterns'])
-                    if tigervnc_path:
-                        client_found = True
-                else:
-                    # Check if executable exists in PATH
-                    if shutil.which(client_info['executable']):
-                        client_found = True
-                    else:
-                        # Check specific locations
-                        for location in client_info['locations']:
-                            if os.path.exists(location):
-                                client_found = True
-                                break
-
-                if client_found:
-                    available.append({
-                        'id': client_id,
-                        'name': client_info['name'],
-                        'supports_password': client_info['supports_password']
-                    })
-
-        elif system == "Darwin":
+        if _SYSTEM == "Darwin":
             available.append({
                 'id': 'macos_screen_sharing',
                 'name': 'macOS Screen Sharing (built-in)',
                 'supports_password': True
             })
 
-        else:  # Linux
-            clients = {
-                'remmina': {'name': 'Remmina', 'supports_password': True},
-                'tigervnc': {'name': 'TigerVNC Viewer', 'supports_password': True},
-                'vinagre': {'name': 'Vinagre', 'supports_password': True}
-            }
-
+        else:
+            # Check clients in preferred order (TigerVNC first on Windows)
+            clients = _WINDOWS_CLIENTS if _SYSTEM == "Windows" else _LINUX_CLIENTS
             for client_id, client_info in clients.items():
-                if shutil.which(client_id):
+                if self._find_client_executable(client_info):
                     available.append({
                         'id': client_id,
                         'name': client_info['name'],
@@ -3,7 +3,6 @@ CLI VNC handling for Tkinter GUI app
 """
 
 import threading
-import time
 
 class CLIVNCHandler:
     def __init__(self, app):
@@ -23,7 +22,7 @@ class CLIVNCHandler:
         selected_client = vnc_data.get('client')  # Get selected VNC client
         fullscreen = vnc_data.get('fullscreen', False)  # Get fullscreen option
 
-        if not all([ip, port, username]):
+        if not (ip and port and username):
             print("Invalid VNC connection data")
             self.app.update_status("Invalid VNC connection data")
             return False
@@ -33,9 +32,9 @@ class CLIVNCHandler:
         self.app.update_status(f"Connecting to VNC{client_info}...")
 
         # Start VNC connection in separate thread
-        vnc_thread = threading.Thread(target=self._connect_vnc_thread,
-                                     args=(ip, port, username, password, selected_client, fullscreen))
-        vnc_thread.daemon = True
+        vnc_thread = threading.Thread(target=self._connect_vnc_thread, name='vnc-connect',
+                                     args=(ip, port, username, password, selected_client, fullscreen),
+                                     daemon=True)
         vnc_thread.start()
 
         return True
@@ -69,8 +68,8 @@ class CLIVNCHandler:
     def _monitor_vnc_connection(self):
         """Monitor VNC connection status."""
         try:
-            while self.app.vnc_connector.is_connected():
-                time.sleep(2)  # Check every 2 seconds
+            # Block until the connector reports that the VNC client exited
+            self.app.vnc_connector.wait_exit()
 
             # Connection ended - show QR window
             print("VNC connection ended")
@@ -1,19 +1,43 @@
+import atexit
 import json
 import os
+import threading
+import time
 from typing import Dict, List, Any
 
+try:
+    import orjson  # Optional, much faster JSON parsing/serialization
+except ImportError:
+    orjson = None
+
 class ConfigManager:
     def __init__(self, config_file='config.json'):
         self.config_file = config_file
         self.config = self.load_config()
+        self._index_servers()
+
+        # Writes are coalesced by a background writer; the lock guards self.config against
+        # being serialized while it is being modified
+        self._lock = threading.RLock()
+        self._save_pending = False
+        self._dirty = threading.Event()
+        threading.Thread(target=self._writer_loop, name='config-writer', daemon=True).start()
+        atexit.register(self._do_save)  # Flush any pending write on exit
+
+    def _index_servers(self):
+        """Index saved servers by (ip, port) for O(1) lookups."""
+        self._server_index = {}
+        for server in self.config.get('saved_servers', []):
+            self._server_index.setdefault((server.get('ip'), server.get('port')), server)
 
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file."""
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
+                with open(self.config_file, 'rb') as f:
+                    data = f.read()
+                return orjson.loads(data) if orjson else json.loads(data)
+            except (ValueError, IOError) as e:  # JSON decode errors are ValueErrors
                 print(f"Error loading config file: {e}")
 
         # Default configuration
@@ -25,12 +49,47 @@ class ConfigManager:
         }
 
     def save_config(self):
-        """Save configuration to file."""
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
-        except IOError as e:
-            print(f"Error saving config file: {e}")
+        """Schedule the configuration to be saved; bursts of changes result in a single write."""
+        with self._lock:
+            self._save_pending = True
+        self._dirty.set()
+
+    def _writer_loop(self):
+        """Write pending configuration changes, waiting briefly so bursts are coalesced."""
+        while True:
+            self._dirty.wait()
+            time.sleep(0.2)
+            self._dirty.clear()
+            try:
+                self._do_save()
+            except Exception as e:
+                # Keep the writer alive so later changes are still saved
+                print(f"Error in config writer: {e}")
+
+    def flush(self):
+        """Write any pending configuration changes immediately."""
+        self._do_save()
+
+    def _do_save(self):
+        """Write the configuration to file if there are unsaved changes."""
+        with self._lock:
+            if not self._save_pending:
+                return
+            self._save_pending = False
+            try:
+                if orjson:
+                    data = orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+                else:
+                    data = json.dumps(self.config, indent=2).encode()
+
+                # Write to a temporary file and swap it in so the config is never left half-written
+                temp_file = self.config_file + '.tmp'
+                with open(temp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_file, self.config_file)
+            except Exception as e:  # IOError, or TypeError for a value JSON can't hold
+                print(f"Error saving config file: {e}")
+                self._save_pending = True  # Retried on the next change or flush
 
     def get_settings(self) -> Dict[str, Any]:
         """Get application settings."""
@@ -42,9 +101,10 @@ class ConfigManager:
 
     def save_settings(self, settings: Dict[str, Any]):
         """Save application settings."""
-        if 'settings' not in self.config:
-            self.config['settings'] = {}
-        self.config['settings'].update(settings)
+        with self._lock:
+            if 'settings' not in self.config:
+                self.config['settings'] = {}
+            self.config['settings'].update(settings)
         self.save_config()
 
     def get_saved_servers(self) -> List[Dict[str, Any]]:
@@ -53,37 +113,39 @@ class ConfigManager:
 
     def save_server(self, server_data: Dict[str, Any]):
         """Save a VNC server configuration."""
-        if 'saved_servers' not in self.config:
-            self.config['saved_servers'] = []
-
-        # Check if server already exists (by IP and port)
-        existing_server = None
-        for i, server in enumerate(self.config['saved_servers']):
-            if (server.get('ip') == server_data.get('ip') and
-                server.get('port') == server_data.get('port')):
-                existing_server = i
-                break
-
-        if existing_server is not None:
-            # Update existing server
-            self.config['saved_servers'][existing_server].update(server_data)
-        else:
-            # Add new server
-            self.config['saved_servers'].append(server_data)
+        with self._lock:
+            if 'saved_servers' not in self.config:
+                self.config['saved_servers'] = []
+
+            # Check if server already exists (by IP and port)
+            key = (server_data.get('ip'), server_data.get('port'))
+            existing_server = self._server_index.get(key)
+
+            if existing_server is not None:
+                # Update existing server
+                existing_server.update(server_data)
+            else:
+                # Add new server
+                self.config['saved_servers'].append(server_data)
+                self._server_index[key] = server_data
 
         self.save_config()
 
     def delete_server(self, server_data: Dict[str, Any]):
         """Delete a saved VNC server."""
-        if 'saved_servers' not in self.config:
-            return
-
-        # Find and remove server
-        self.config['saved_servers'] = [
-            server for server in self.config['saved_servers']
-            if not (server.get('ip') == server_data.get('ip') and
-                   server.get('port') == server_data.get('port'))
-        ]
+        with self._lock:
+            if 'saved_servers' not in self.config:
+                return
+
+            # Nothing to do (and nothing to write) if the server isn't saved
+            key = (server_data.get('ip'), server_data.get('port'))
+            if self._server_index.pop(key, None) is None:
+                return
+
+            self.config['saved_servers'] = [
+                server for server in self.config['saved_servers']
+                if (server.get('ip'), server.get('port')) != key
+            ]
 
         self.save_config()
 
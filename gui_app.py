@@ -1,30 +1,58 @@
+import logging
+import os
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
-import qrcode
-from PIL import Image, ImageTk
 from network_utils import get_local_ip
-from cli_vnc_connector import CLIVNCConnector
-import threading
-import json
+
+logger = logging.getLogger(__name__)
+
+# Shared colors and fonts for the QR window
+BG_COLOR = '#2c3e50'
+FG_COLOR = 'white'
+STATUS_COLOR = '#bdc3c7'
+INFO_COLOR = '#95a5a6'
+URL_FONT = ('Arial', 20, 'bold')
+STATUS_FONT = ('Arial', 14)
+INFO_FONT = ('Arial', 10)
+
+# Rendered QR codes are cached here so restarts on the same IP skip regeneration
+QR_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'vncqr')
 
 class VNCQRApp:
     def __init__(self, config_manager, web_server):
         self.config_manager = config_manager
         self.web_server = web_server
-        self.vnc_connector = CLIVNCConnector()
         self.vnc_mode = False
         self.vnc_window = None
-
-        # Set callback for web server VNC requests
-        self.web_server.set_vnc_callback(self.handle_vnc_request)
+        self.vnc_handler = None  # Created on the first VNC request
+        self._last_status = None
+        # Filled in by create_qr_section / below; None until then
+        self.status_label = None
+        self.vnc_info_label = None
+        self.vnc_connector = None
 
         # Create main window
         self.root = tk.Tk()
         self.setup_window()
+
+        # Bound once; _on_escape picks the action based on the current mode
+        self.root.bind('<Escape>', self._on_escape)
+
+        # Imported after the window is up so it can paint while the connector loads
+        from cli_vnc_connector import CLIVNCConnector
+        self.vnc_connector = CLIVNCConnector()
+
+        # Set callback for web server VNC requests
+        self.web_server.set_vnc_callback(self.handle_vnc_request)
+
         self.create_qr_display()
 
-        # Show available VNC clients
-        self.show_vnc_client_info()
+        # Probe for VNC clients off the Tk thread so the window paints right away. The
+        # thread is started from the event loop because its root.after() call fails
+        # if the main loop isn't running yet
+        discovery_thread = threading.Thread(target=self.show_vnc_client_info,
+                                            name='vnc-client-discovery', daemon=True)
+        self.root.after_idle(discovery_thread.start)
 
     def setup_window(self):
         """Configure the main window to be fullscreen, always on top, and without decorations."""
@@ -33,7 +61,7 @@ class VNCQRApp:
 
             # Start in windowed mode, then go fullscreen to avoid crashes
             self.root.geometry("800x600")
-            self.root.configure(bg='#2c3e50')
+            self.root.configure(bg=BG_COLOR)
 
             # Update display
             self.root.update()
@@ -43,64 +71,94 @@ class VNCQRApp:
             self.root.attributes('-topmost', True)
             self.root.overrideredirect(True)  # Remove window decorations
 
-            # Bind escape key to exit
-            self.root.bind('<Escape>', self.exit_app)
-
         except Exception as e:
             print(f"Error setting up window: {e}")
             # Fallback to basic window
             self.root.title("VNC QR Server")
             self.root.geometry("800x600")
-            self.root.configure(bg='#2c3e50')
+            self.root.configure(bg=BG_COLOR)
 
     def create_qr_display(self):
         """Create simple QR code display."""
         # Main container
-        main_frame = tk.Frame(self.root, bg='#2c3e50')
+        main_frame = tk.Frame(self.root, bg=BG_COLOR)
         main_frame.pack(fill='both', expand=True)
 
         # QR Code section in the center
-        self.qr_frame = tk.Frame(main_frame, bg='#2c3e50')
+        self.qr_frame = tk.Frame(main_frame, bg=BG_COLOR)
         self.qr_frame.pack(expand=True, fill='both')
 
         self.create_qr_section(self.qr_frame)
 
     def create_qr_section(self, parent):
         """Create QR code display section."""
-        # Generate QR code
-        local_ip = get_local_ip()
-        qr_url = f"http://{local_ip}:8080"
-
-        qr = qrcode.QRCode(version=1, box_size=15, border=5)
-        qr.add_data(qr_url)
-        qr.make(fit=True)
+        # Only needed once, so imported here rather than at startup
+        from PIL import ImageTk
 
-        qr_img = qr.make_image(fill_color="white", back_color="#2c3e50")
-        qr_img = qr_img.resize((500, 500), Image.Resampling.LANCZOS)
-        self.qr_photo = ImageTk.PhotoImage(qr_img)
+        # Generate QR code
+        self._local_ip = get_local_ip()
+        qr_url = f"http://{self._local_ip}:8080"
+        self.qr_photo = ImageTk.PhotoImage(self.get_qr_image(self._local_ip, qr_url))
 
         # QR Code label
-        self.qr_label = tk.Label(parent, image=self.qr_photo, bg='#2c3e50')
+        self.qr_label = tk.Label(parent, image=self.qr_photo, bg=BG_COLOR)
         self.qr_label.pack(expand=True)
 
         # URL label
-        self.url_label = tk.Label(parent, text=qr_url, font=('Arial', 20, 'bold'),
-                                fg='white', bg='#2c3e50')
+        self.url_label = tk.Label(parent, text=qr_url, font=URL_FONT,
+                                fg=FG_COLOR, bg=BG_COLOR)
         self.url_label.pack(pady=20)
 
         # Status label
         self.status_label = tk.Label(parent, text="Scan QR code to access VNC control",
-                                   font=('Arial', 14), fg='#bdc3c7', bg='#2c3e50')
+                                   font=STATUS_FONT, fg=STATUS_COLOR, bg=BG_COLOR)
         self.status_label.pack(pady=10)
 
         # VNC client info
         self.vnc_info_label = tk.Label(parent, text="",
-                                     font=('Arial', 10), fg='#95a5a6', bg='#2c3e50')
+                                     font=INFO_FONT, fg=INFO_COLOR, bg=BG_COLOR)
         self.vnc_info_label.pack(pady=(0, 10))
+
+    def get_qr_image(self, local_ip, qr_url):
+        """Get the QR code image for qr_url, reusing a cached render for this IP if there is one."""
+        from PIL import Image
+
+        # Raw RGB pixels rather than PNG, so loading skips decompression entirely
+        cache_path = os.path.join(QR_CACHE_DIR, f"{local_ip}-v2-500.rgb")
+        try:
+            with open(cache_path, 'rb') as f:
+                raw = f.read()
+            if len(raw) == 500 * 500 * 3:
+                return Image.frombytes('RGB', (500, 500), raw)
+        except OSError:
+            pass  # Not cached yet (or unreadable), render it below
+
+        import qrcode
+
+        qr = qrcode.QRCode(version=1, box_size=15, border=5)
+        qr.add_data(qr_url)
+        qr.make(fit=True)
+
+        # Render close to 500px natively; QR modules are hard-edged so NEAREST covers the rest
+        qr.box_size = max(1, 500 // (qr.modules_count + 2 * qr.border))
+        qr_img = qr.make_image(fill_color=FG_COLOR, back_color=BG_COLOR)
+        if qr_img.size != (500, 500):
+            qr_img = qr_img.resize((500, 500), Image.Resampling.NEAREST)
+        qr_img = qr_img.convert('RGB')
+
+        try:
+            os.makedirs(QR_CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                f.write(qr_img.tobytes())
+        except OSError as e:
+            print(f"Could not cache QR code image: {e}")
+
+        return qr_img
+
     def handle_vnc_request(self, vnc_data):
         """Handle VNC connection request from web interface."""
-        from cli_vnc_handler import CLIVNCHandler
-        if not hasattr(self, 'vnc_handler'):
+        if self.vnc_handler is None:
+            from cli_vnc_handler import CLIVNCHandler
             self.vnc_handler = CLIVNCHandler(self)
         return self.vnc_handler.handle_vnc_request(vnc_data)
 
@@ -125,20 +183,27 @@ class VNCQRApp:
                 print("  macOS: Built-in Screen Sharing (vnc:// URLs)")
                 print("  Linux: remmina, vncviewer, vinagre")
 
-            if hasattr(self, 'vnc_info_label'):
-                self.vnc_info_label.config(text=info_text)
+            if self.vnc_info_label is not None:
+                self.root.after(0, self.vnc_info_label.config, {'text': info_text})
 
         except Exception as e:
             print(f"Error checking VNC clients: {e}")
 
     def update_status(self, message):
         """Update status message."""
-        if hasattr(self, 'status_label'):
-            self.status_label.config(text=message)
-        print(f"Status: {message}")
+        # Repeated messages don't need another trip through the Tk event queue
+        if message == self._last_status:
+            return
+        self._last_status = message
+
+        # Called from VNC worker threads too, so hand the widget update to the Tk loop
+        if self.status_label is not None:
+            self.root.after(0, self.status_label.config, {'text': message})
+        logger.debug("Status: %s", message)
 
     def hide_window(self):
         """Hide the QR code window when VNC is connected."""
+        self.vnc_mode = True
         try:
             self.root.withdraw()
             print("QR window hidden")
@@ -147,6 +212,7 @@ class VNCQRApp:
 
     def show_window(self):
         """Show the QR code window when VNC is disconnected."""
+        self.vnc_mode = False
         try:
             self.root.deiconify()
             self.root.lift()
@@ -155,11 +221,18 @@ class VNCQRApp:
         except Exception as e:
             print(f"Error showing window: {e}")
 
+    def _on_escape(self, event=None):
+        """Stop the VNC client while in VNC mode, otherwise exit."""
+        if self.vnc_mode and self.vnc_handler is not None:
+            self.vnc_handler.disconnect_vnc()
+        else:
+            self.exit_app()
+
     def exit_app(self, event=None):
         """Exit the application."""
         try:
             # Disconnect VNC if connected
-            if hasattr(self, 'vnc_connector') and self.vnc_connector:
+            if self.vnc_connector is not None:
                 self.vnc_connector.disconnect()
         except Exception as e:
             print(f"Error disconnecting VNC on exit: {e}")
@@ -169,19 +242,7 @@ class VNCQRApp:
 
     def run(self):
         """Start the GUI application."""
-        # Bind ESC to exit when not in VNC mode
-        self.root.bind('<Escape>', self.exit_app)
-
         # Set up window closing protocol
         self.root.protocol("WM_DELETE_WINDOW", self.exit_app)
 
         self.root.mainloop()
-
-    def exit_app(self, event=None):
-        """Exit the application."""
-        self.root.quit()
-        self.root.destroy()
-
-    def run(self):
-        """Start the GUI application."""
-        self.root.mainloop()
@@ -6,15 +6,37 @@ and provides VNC client functionality using system VNC clients.
 """
 
 from threading import Thread
+import atexit
+import logging
+import logging.handlers
+import queue
 import sys
 import os
 
-from gui_app import VNCQRApp
 from web_server import WebServer
 from config_manager import ConfigManager
 
+def setup_logging():
+    """Route log records through a queue so callers never block on console writes.
+
+    Returns the queue listener; it is stopped at exit, which flushes queued records.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    return listener
+
 def main():
     """Main application entry point."""
+    log_listener = setup_logging()
     try:
         print("Starting VNC QR Server...")
 
@@ -25,12 +47,14 @@ def main():
         # Start web server in background thread
         print("Starting web server...")
         web_server = WebServer(config_manager)
-        web_thread = Thread(target=web_server.run, daemon=True)
+        web_thread = Thread(target=web_server.run, name='web-server', daemon=True)
         web_thread.start()
 
-        # Give web server time to start
-        import time
-        time.sleep(1)
+        # Imported here so tkinter loads while the web server is binding
+        from gui_app import VNCQRApp
+
+        # Wait until the web server is listening instead of sleeping a fixed time
+        web_server.ready.wait(timeout=5.0)
         print("Web server started")
 
         # Create and run Tkinter GUI application
@@ -47,6 +71,18 @@ def main():
 
         web_server.set_shutdown_callback(shutdown_application)
 
+        # A fast shutdown ends with os._exit, which skips the atexit listener.stop,
+        # so the viewer and queued log records are dealt with here instead
+        def fast_exit_application():
+            try:
+                app.vnc_connector.disconnect()
+            except Exception as e:
+                print(f"Error disconnecting VNC on exit: {e}")
+            log_listener.stop()
+            sys.stdout.flush()
+
+        web_server.set_fast_exit_callback(fast_exit_application)
+
         print("Starting Tkinter GUI...")
         app.run()
 
@@ -2,12 +2,50 @@ import socket
 import subprocess
 import re
 import platform
+import threading
+import time
+
+# The OS can't change while running, so platform-specific helpers are picked once
+_SYSTEM = platform.system()
+
+# Addresses rarely change, so lookups are reused for a few seconds
+_CACHE_TTL = 5.0
+_IP_CACHE = {'ip': None, 'ts': 0.0}
+_INTERFACES_CACHE = {'interfaces': None, 'ts': 0.0}
+
+# Patterns for parsing ifconfig / ipconfig / ip output. Octets are limited to 0-255
+# so invalid candidates are rejected early instead of matching any digit run.
+_OCTET = r'(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)'
+_IPV4 = r'\b(' + _OCTET + r'(?:\.' + _OCTET + r'){3})\b'
+_IPV4_RE = re.compile(_IPV4)
+_INET_RE = re.compile(r'inet\s+' + _IPV4)
+_SRC_RE = re.compile(r'src\s+' + _IPV4)
+_WIN_IPV4_RE = re.compile(r'IPv4 Address[.\s]*:\s*' + _IPV4)
+_IP_ADDR_RE = re.compile(r'^\d+:\s+([^\s@]+)\S*\s+inet\s+' + _IPV4, re.MULTILINE)
+_IFCONFIG_BLOCK_RE = re.compile(r'^([^\s:]+):[^\n]*(?:\n[ \t][^\n]*)*', re.MULTILINE)
+
+def invalidate_ip_cache():
+    """Forget cached addresses so the next lookup queries the system again."""
+    _IP_CACHE['ip'] = None
+    _INTERFACES_CACHE['interfaces'] = None
 
 def get_local_ip():
     """Get the local IP address (not loopback)."""
+    now = time.monotonic()
+    if _IP_CACHE['ip'] is not None and now - _IP_CACHE['ts'] < _CACHE_TTL:
+        return _IP_CACHE['ip']
+
+    local_ip = _lookup_local_ip()
+    _IP_CACHE['ip'] = local_ip
+    _IP_CACHE['ts'] = now
+    return local_ip
+
+def _lookup_local_ip():
+    """Look up the local IP address without consulting the cache."""
     try:
         # Method 1: Connect to a remote address and get local IP
         with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.settimeout(0.2)
             s.connect(("8.8.8.8", 80))
             local_ip = s.getsockname()[0]
             if not local_ip.startswith('127.'):
@@ -17,36 +55,48 @@ def get_local_ip():
     
     try:
         # Method 2: Use hostname resolution
-        hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
-        if not local_ip.startswith('127.'):
+        local_ip = _resolve_hostname(timeout=0.2)
+        if local_ip and not local_ip.startswith('127.'):
             return local_ip
     except Exception:
         pass
     
-    # Method 3: Parse network interfaces (platform-specific)
-    system = platform.system()
-    
-    if system == "Darwin":  # macOS
-        return get_mac_ip()
-    elif system == "Windows":
-        return get_windows_ip()
-    else:
-        return get_linux_ip()
+    # Method 3: Ask the OS for interface addresses directly
+    interfaces = _get_psutil_interfaces()
+    if interfaces:
+        return interfaces[0]['ip']
+
+    # Method 4: Parse network interfaces (platform-specific)
+    return _GET_IP_IMPL()
+
+def _resolve_hostname(timeout):
+    """Resolve this machine's hostname, giving up after timeout seconds."""
+    # gethostbyname has no timeout of its own, so run it where it can be abandoned
+    result = []
+
+    def resolve():
+        try:
+            result.append(socket.gethostbyname(socket.gethostname()))
+        except Exception:
+            pass
+
+    resolver = threading.Thread(target=resolve, name='hostname-resolve', daemon=True)
+    resolver.start()
+    resolver.join(timeout)
+    return result[0] if result else None
 
 def get_mac_ip():
     """Get IP address on macOS."""
     try:
         # Use ifconfig to get network interfaces
-        result = subprocess.run(['ifconfig'], capture_output=True, text=True, timeout=5)
+        result = subprocess.run(['ifconfig'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=5)
         output = result.stdout
         
         # Look for inet addresses that are not loopback
-        lines = output.split('\n')
-        for i, line in enumerate(lines):
+        for line in output.splitlines():
             if 'inet ' in line and '127.0.0.1' not in line:
                 # Extract IP address
-                ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)', line)
+                ip_match = _INET_RE.search(line)
                 if ip_match:
                     ip = ip_match.group(1)
                     # Skip link-local addresses
@@ -62,12 +112,11 @@ def get_mac_ip():
 def get_windows_ip():
     """Get IP address on Windows."""
     try:
-        result = subprocess.run(['ipconfig'], capture_output=True, text=True, shell=True)
+        result = subprocess.run(['ipconfig'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, shell=True)
         output = result.stdout
         
         # Look for IPv4 addresses that are not loopback
-        ip_pattern = r'IPv4 Address[.\s]*:\s*(\d+\.\d+\.\d+\.\d+)'
-        matches = re.findall(ip_pattern, output)
+        matches = _WIN_IPV4_RE.findall(output)
         
         for ip in matches:
             if not ip.startswith('127.') and not ip.startswith('169.254.'):
@@ -83,12 +132,12 @@ def get_linux_ip():
     """Get IP address on Linux."""
     try:
         # Try ip command first
-        result = subprocess.run(['ip', 'route', 'get', '8.8.8.8'], 
-                              capture_output=True, text=True, timeout=5)
+        result = subprocess.run(['ip', 'route', 'get', '8.8.8.8'],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=5)
         output = result.stdout
         
         # Parse the output to get source IP
-        src_match = re.search(r'src\s+(\d+\.\d+\.\d+\.\d+)', output)
+        src_match = _SRC_RE.search(output)
         if src_match:
             return src_match.group(1)
             
@@ -97,13 +146,13 @@ def get_linux_ip():
     
     try:
         # Fallback to ifconfig
-        result = subprocess.run(['ifconfig'], capture_output=True, text=True, timeout=5)
+        result = subprocess.run(['ifconfig'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=5)
         output = result.stdout
         
         # Look for inet addresses that are not loopback
-        for line in output.split('\n'):
+        for line in output.splitlines():
             if 'inet ' in line and '127.0.0.1' not in line:
-                ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)', line)
+                ip_match = _INET_RE.search(line)
                 if ip_match:
                     ip = ip_match.group(1)
                     if not ip.startswith('169.254.'):
@@ -115,6 +164,8 @@ def get_linux_ip():
     # Fallback to localhost
     return "127.0.0.1"
 
+_GET_IP_IMPL = {'Darwin': get_mac_ip, 'Windows': get_windows_ip}.get(_SYSTEM, get_linux_ip)
+
 def is_port_available(port, host='localhost'):
     """Check if a port is available."""
     try:
@@ -127,67 +178,113 @@ def is_port_available(port, host='localhost'):
 
 def get_network_interfaces():
     """Get all network interfaces and their IP addresses."""
+    now = time.monotonic()
+    if _INTERFACES_CACHE['interfaces'] is None or now - _INTERFACES_CACHE['ts'] >= _CACHE_TTL:
+        _INTERFACES_CACHE['interfaces'] = _lookup_network_interfaces()
+        _INTERFACES_CACHE['ts'] = now
+    # Copies so callers can't modify the cached entries
+    return [dict(interface) for interface in _INTERFACES_CACHE['interfaces']]
+
+def _get_psutil_interfaces():
+    """Get non-loopback IPv4 interfaces via psutil, or None if psutil is unavailable."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+
     interfaces = []
-    system = platform.system()
-    
     try:
-        if system == "Darwin" or system == "Linux":
-            # Unix-like systems
-            result = subprocess.run(['ifconfig'], capture_output=True, text=True, timeout=5)
-            output = result.stdout
-            
-            # Parse the output to extract interface information
-            current_interface = None
-            for line in output.split('\n'):
-                line = line.strip()
-                
-                # Look for interface names (lines that don't start with whitespace)
-                if ':' in line and not line.startswith(' ') and not line.startswith('\t'):
-                    current_interface = line.split(':')[0].strip()
-                    continue
-                    
-                # Look for inet addresses
-                if 'inet ' in line and current_interface:
-                    ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)', line)
-                    if ip_match:
-                        ip = ip_match.group(1)
-                        if not ip.startswith('127.') and not ip.startswith('169.254.'):
-                            interfaces.append({
-                                'name': current_interface,
-                                'ip': ip
-                            })
-                            
-        elif system == "Windows":
-            # Windows command to get network interfaces
-            result = subprocess.run(['ipconfig', '/all'], capture_output=True, text=True, shell=True)
-            output = result.stdout
-            
-            # Parse the output to extract interface information
-            current_interface = None
-            for line in output.split('\n'):
-                line = line.strip()
-                
-                # Look for adapter names
-                if 'adapter' in line.lower() and ':' in line:
-                    current_interface = line.split(':')[0].strip()
-                    continue
-                    
-                # Look for IPv4 addresses
-                if 'IPv4 Address' in line and current_interface:
-                    ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                    if ip_match:
-                        ip = ip_match.group(1)
-                        if not ip.startswith('127.') and not ip.startswith('169.254.'):
-                            interfaces.append({
-                                'name': current_interface,
-                                'ip': ip
-                            })
-                            
+        for name, addresses in psutil.net_if_addrs().items():
+            for address in addresses:
+                if address.family == socket.AF_INET and not address.address.startswith(('127.', '169.254.')):
+                    interfaces.append({
+                        'name': name,
+                        'ip': address.address
+                    })
+    except Exception as e:
+        print(f"Error getting network interfaces via psutil: {e}")
+        return None
+
+    return interfaces
+
+def _lookup_network_interfaces():
+    """Look up network interfaces without consulting the cache."""
+    # psutil reads the interface table in-process; ifconfig/ipconfig parsing is the fallback
+    interfaces = _get_psutil_interfaces()
+    if interfaces is not None:
+        return interfaces
+
+    try:
+        return _GET_INTERFACES_IMPL()
     except Exception as e:
         print(f"Error getting network interfaces: {e}")
-        
+        return []
+
+def _get_unix_interfaces():
+    """Get network interfaces by parsing ifconfig output."""
+    interfaces = []
+    result = subprocess.run(['ifconfig'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=5)
+    output = result.stdout
+
+    # Each block is an unindented "name:" header plus its indented detail lines
+    for block in _IFCONFIG_BLOCK_RE.finditer(output):
+        for ip in _INET_RE.findall(block.group(0)):
+            if not ip.startswith(('127.', '169.254.')):
+                interfaces.append({
+                    'name': block.group(1),
+                    'ip': ip
+                })
+
     return interfaces
 
+def _get_linux_interfaces():
+    """Get network interfaces from 'ip -4 -o addr', falling back to ifconfig."""
+    try:
+        # One line per IPv4 address, so there is far less output to parse than ifconfig's
+        result = subprocess.run(['ip', '-4', '-o', 'addr', 'show'],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=5)
+    except OSError:
+        return _get_unix_interfaces()
+    if result.returncode != 0:
+        return _get_unix_interfaces()
+
+    return [{'name': name, 'ip': ip} for name, ip in _IP_ADDR_RE.findall(result.stdout)
+            if not ip.startswith(('127.', '169.254.'))]
+
+def _get_windows_interfaces():
+    """Get network interfaces by parsing ipconfig /all output."""
+    interfaces = []
+    result = subprocess.run(['ipconfig', '/all'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, shell=True)
+    output = result.stdout
+
+    # Parse the output to extract interface information
+    current_interface = None
+    for line in output.splitlines():
+        # Adapter names are the only unindented lines; detail lines start with spaces
+        if line and not line[0].isspace():
+            if ':' in line and 'adapter' in line.lower():
+                current_interface = line.split(':')[0].strip()
+            continue
+
+        # Look for IPv4 addresses
+        if 'IPv4 Address' in line and current_interface:
+            ip_match = _IPV4_RE.search(line)
+            if ip_match:
+                ip = ip_match.group(1)
+                if not ip.startswith('127.') and not ip.startswith('169.254.'):
+                    interfaces.append({
+                        'name': current_interface,
+                        'ip': ip
+                    })
+
+    return interfaces
+
+_GET_INTERFACES_IMPL = {
+    'Darwin': _get_unix_interfaces,
+    'Linux': _get_linux_interfaces,
+    'Windows': _get_windows_interfaces,
+}.get(_SYSTEM, list)
+
 def test_connectivity(host="8.8.8.8", port=53, timeout=3):
     """Test internet connectivity."""
     try:
@@ -7,14 +7,19 @@ Manages auto-startup functionality for Windows and macOS
 import os
 import sys
 import platform
+import plistlib
 import subprocess
 from tkinter import messagebox
 import tkinter as tk
 
+if platform.system() == "Windows":
+    import winreg
+
 class StartupManager:
     def __init__(self):
         self.app_name = "VNCQRServer"
         self.system = platform.system()
+        self._startup_enabled = None  # Cached status, reset by enable/disable
 
         if self.system == "Darwin":  # macOS
             self.launch_agent_name = "com.vncqrserver.app"
@@ -32,15 +37,20 @@ class StartupManager:
 
     def is_startup_enabled(self):
         """Check if auto-startup is currently enabled."""
-        if self.system == "Darwin":
-            return self._is_mac_startup_enabled()
-        elif self.system == "Windows":
-            return self._is_windows_startup_enabled()
-        else:
-            return False
+        if self._startup_enabled is None:
+            if self.system == "Darwin":
+                self._startup_enabled = self._is_mac_startup_enabled()
+            elif self.system == "Windows":
+                self._startup_enabled = self._is_windows_startup_enabled()
+            else:
+                self._startup_enabled = False
+        return self._startup_enabled
 
     def _is_mac_startup_enabled(self):
         """Check if macOS LaunchAgent is loaded."""
+        # Without the plist the agent can't be set up, so skip spawning launchctl
+        if not os.path.exists(self.plist_path):
+            return False
         try:
             result = subprocess.run(['launchctl', 'list', self.launch_agent_name],
                                   capture_output=True, text=True)
@@ -51,7 +61,6 @@ class StartupManager:
     def _is_windows_startup_enabled(self):
         """Check if Windows registry entry exists."""
         try:
-            import winreg
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_key, 0, winreg.KEY_READ) as key:
                 try:
                     value, _ = winreg.QueryValueEx(key, self.app_name)
@@ -63,6 +72,7 @@ class StartupManager:
 
     def enable_startup(self):
         """Enable auto-startup."""
+        self._startup_enabled = None
         if self.system == "Darwin":
             return self._enable_mac_startup()
         elif self.system == "Windows":
@@ -77,36 +87,24 @@ class StartupManager:
             main_py_path = self.get_app_path()
             working_dir = os.path.dirname(main_py_path)
 
-            plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>Label</key>
-    <string>{self.launch_agent_name}</string>
-    <key>ProgramArguments</key>
-    <array>
-        <string>{sys.executable}</string>
-        <string>{main_py_path}</string>
-    </array>
-    <key>RunAtLoad</key>
-    <true/>
-    <key>KeepAlive</key>
-    <false/>
-    <key>WorkingDirectory</key>
-    <string>{working_dir}</string>
-    <key>StandardOutPath</key>
-    <string>/tmp/vncqrserver.log</string>
-    <key>StandardErrorPath</key>
-    <string>/tmp/vncqrserver.error.log</string>
-</dict>
-</plist>"""
+            # plistlib copes with paths containing &, < or quotes, which corrupted the hand-written XML
+            plist = {
+                'Label': self.launch_agent_name,
+                'ProgramArguments': [sys.executable, main_py_path],
+                'RunAtLoad': True,
+                'KeepAlive': False,
+                'WorkingDirectory': working_dir,
+                'StandardOutPath': '/tmp/vncqrserver.log',
+                'StandardErrorPath': '/tmp/vncqrserver.error.log',
+            }
 
             # Ensure LaunchAgents directory exists
             os.makedirs(os.path.dirname(self.plist_path), exist_ok=True)
 
-            # Write plist file
-            with open(self.plist_path, 'w') as f:
-                f.write(plist_content)
+            # Write plist file (binary format, which launchd reads without XML parsing)
+            plist_data = plistlib.dumps(plist, fmt=plistlib.FMT_BINARY)
+            with open(self.plist_path, 'wb') as f:
+                f.write(plist_data)
 
             # Load the LaunchAgent
             subprocess.run(['launchctl', 'load', self.plist_path], check=True)
@@ -119,7 +117,6 @@ class StartupManager:
     def _enable_windows_startup(self):
         """Enable Windows startup via registry."""
         try:
-            import winreg
             app_path = self.get_app_path()
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_key, 0, winreg.KEY_SET_VALUE) as key:
                 winreg.SetValueEx(key, self.app_name, 0, winreg.REG_SZ, app_path)
@@ -130,6 +127,7 @@ class StartupManager:
 
     def disable_startup(self):
         """Disable auto-startup."""
+        self._startup_enabled = None
         if self.system == "Darwin":
             return self._disable_mac_startup()
         elif self.system == "Windows":
@@ -154,7 +152,6 @@ class StartupManager:
     def _disable_windows_startup(self):
         """Disable Windows startup."""
         try:
-            import winreg
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_key, 0, winreg.KEY_SET_VALUE) as key:
                 winreg.DeleteValue(key, self.app_name)
             return True
@@ -1,16 +1,51 @@
-from flask import Flask, render_template, request, jsonify
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, render_template, request, jsonify
+from flask_socketio import SocketIO, emit, join_room
+from werkzeug.serving import make_server
+import json
+import logging
+import socket
 import threading
+import time
 import os
 from network_utils import get_local_ip
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson  # Optional, much faster JSON serialization
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress  # Optional, compresses the ~20 KB index page
+except ImportError:
+    Compress = None
+
 class WebServer:
     def __init__(self, config_manager):
         self.config_manager = config_manager
         self.app = Flask(__name__)
         self.app.config['SECRET_KEY'] = 'vnc_qr_server_secret'
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*")
+        if Compress:
+            self.app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+            self.app.config['COMPRESS_MIN_SIZE'] = 500
+            Compress(self.app)
+        # Threading mode: run() serves the app with Werkzeug's threaded server, one thread
+        # per connection; simple-websocket upgrades Socket.IO clients off long-polling
+        self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode='threading')
         self.vnc_callback = None  # Callback to desktop app for VNC connections
+        self.fast_exit_callback = None  # Releases app resources before a fast shutdown
+        self.ready = threading.Event()  # Set once the server is listening (or has given up)
+        # Fixed for the life of the process, so it is looked up once
+        self.autostart_supported = config_manager.is_autostart_supported()
+        self._vnc_connector = None  # Created on the first /api/vnc-clients request
+        self._vnc_clients_cache = (0.0, None)  # (monotonic timestamp, client list)
+        # Encoded GET payloads; entries from before the last config write are ignored
+        self._json_cache = {}
+        self._config_version = 0
+        # Status changes are coalesced briefly so a burst results in one emit
+        self._status_lock = threading.Lock()
+        self._pending_status = None
         self.setup_routes()
         self.setup_socketio()
 
@@ -22,130 +57,205 @@ class WebServer:
         """Set callback function for server shutdown."""
         self.shutdown_callback = callback
 
+    def set_fast_exit_callback(self, callback):
+        """Set callback run just before a fast shutdown; it must not touch the GUI."""
+        self.fast_exit_callback = callback
+
+    def _cached_json(self, name, get_data):
+        """Return get_data() as a JSON response, reusing the encoded body until the config changes."""
+        version = self._config_version
+        cached = self._json_cache.get(name)
+        if cached is None or cached[0] != version:
+            data = get_data()
+            body = orjson.dumps(data) if orjson else json.dumps(data).encode()
+            cached = (version, body)
+            self._json_cache[name] = cached
+        return Response(cached[1], mimetype='application/json')
+
+    def _config_changed(self):
+        """Invalidate cached JSON responses after a config write."""
+        self._config_version += 1
+
     def setup_routes(self):
         """Setup Flask routes."""
+        self.app.add_url_rule('/', 'index', self.index)
+        self.app.add_url_rule('/api/settings', 'api_settings', self.api_settings,
+                              methods=['GET', 'POST'])
+        self.app.add_url_rule('/api/vnc-clients', 'api_vnc_clients', self.api_vnc_clients,
+                              methods=['GET'])
+        self.app.add_url_rule('/api/servers', 'api_servers', self.api_servers,
+                              methods=['GET', 'POST', 'DELETE'])
 
-        @self.app.route('/')
-        def index():
-            """Main web interface."""
-            local_ip = get_local_ip()
-            saved_servers = self.config_manager.get_saved_servers()
-            autostart_supported = self.config_manager.is_autostart_supported()
-            return render_template('index.html',
-                                 local_ip=local_ip,
-                                 saved_servers=saved_servers,
-                                 autostart_supported=autostart_supported)
-
-        @self.app.route('/api/settings', methods=['GET', 'POST'])
-        def api_settings():
-            """API endpoint for settings."""
-            if request.method == 'GET':
-                return jsonify(self.config_manager.get_settings())
-            elif request.method == 'POST':
-                settings = request.get_json()
-                if autostart_supported:
-                    self.config_manager.save_settings(settings)
-                return jsonify({'status': 'success'})
-
-        @self.app.route('/api/vnc-clients', methods=['GET'])
-        def api_vnc_clients():
-            """API endpoint to get available VNC clients."""
-            try:
-                from cli_vnc_connector import CLIVNCConnector
-                connector = CLIVNCConnector()
-                available_clients = connector.get_available_clients()
-                return jsonify({
-                    'status': 'success',
-                    'clients': available_clients
-                })
-            except Exception as e:
-                return jsonify({
-                    'status': 'error',
-                    'message': str(e)
-                })
-
-        @self.app.route('/api/servers', methods=['GET', 'POST', 'DELETE'])
-        def api_servers():
-            """API endpoint for VNC servers."""
-            if request.method == 'GET':
-                return jsonify(self.config_manager.get_saved_servers())
-            elif request.method == 'POST':
-                server_data = request.get_json()
-                self.config_manager.save_server(server_data)
-                return jsonify({'status': 'success'})
-            elif request.method == 'DELETE':
-                server_data = request.get_json()
-                self.config_manager.delete_server(server_data)
-                return jsonify({'status': 'success'})
+    def index(self):
+        """Main web interface."""
+        local_ip = get_local_ip()  # Cached for a few seconds by network_utils
+        saved_servers = self.config_manager.get_saved_servers()
+        return render_template('index.html',
+                             local_ip=local_ip,
+                             saved_servers=saved_servers,
+                             autostart_supported=self.autostart_supported)
+
+    def api_settings(self):
+        """API endpoint for settings."""
+        if request.method == 'GET':
+            return self._cached_json('settings', self.config_manager.get_settings)
+        elif request.method == 'POST':
+            settings = request.get_json()
+            if self.autostart_supported:
+                self.config_manager.save_settings(settings)
+                self._config_changed()
+            return jsonify({'status': 'success'})
+
+    def api_vnc_clients(self):
+        """API endpoint to get available VNC clients."""
+        try:
+            # Installed viewers rarely change, so answer from a short-lived cache
+            cached_at, available_clients = self._vnc_clients_cache
+            if available_clients is None or time.monotonic() - cached_at >= 10.0:
+                # Imported here so the web server starts without pulling in the
+                # connector's platform modules (pywinauto on Windows)
+                from cli_vnc_connector import CLIVNCConnector, invalidate_client_cache
+                if self._vnc_connector is None:
+                    self._vnc_connector = CLIVNCConnector()
+                # Re-probe so installed or removed viewers show up on refresh
+                invalidate_client_cache()
+                available_clients = self._vnc_connector.get_available_clients()
+                self._vnc_clients_cache = (time.monotonic(), available_clients)
+            return jsonify({
+                'status': 'success',
+                'clients': available_clients
+            })
+        except Exception as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            })
+
+    def api_servers(self):
+        """API endpoint for VNC servers."""
+        if request.method == 'GET':
+            return self._cached_json('servers', self.config_manager.get_saved_servers)
+
+        # Parsed once and checked up front, so the config only ever sees well-formed entries
+        server_data = request.get_json(silent=True)
+        if not isinstance(server_data, dict) or not server_data.get('ip') or not server_data.get('port'):
+            return jsonify({'status': 'error', 'message': 'Invalid server data'}), 400
+
+        if request.method == 'POST':
+            self.config_manager.save_server(server_data)
+        else:
+            self.config_manager.delete_server(server_data)
+        self._config_changed()
+        return jsonify({'status': 'success'})
 
     def setup_socketio(self):
         """Setup WebSocket events."""
+        self.socketio.on_event('connect', self.handle_connect)
+        self.socketio.on_event('disconnect', self.handle_disconnect)
+        self.socketio.on_event('vnc_connect', self.handle_vnc_connect)
+        self.socketio.on_event('vnc_disconnect', self.handle_vnc_disconnect)
+        self.socketio.on_event('shutdown_server', self.handle_shutdown_server)
+
+    def handle_connect(self, auth=None):
+        """Handle a new web client connection."""
+        logger.debug("Web client connected")
+        join_room('vnc_watchers')
 
-        @self.socketio.on('connect')
-        def handle_connect():
-            print("Web client connected")
-
-        @self.socketio.on('disconnect')
-        def handle_disconnect():
-            print("Web client disconnected")
-
-        @self.socketio.on('vnc_connect')
-        def handle_vnc_connect(data):
-            """Handle VNC connection request from web client."""
-            print(f"VNC connection request: {data}")
-
-            # Save server if requested
-            if data.get('save_server', False):
-                server_data = {
-                    'ip': data['ip'],
-                    'port': data['port'],
-                    'username': data['username']
-                }
-                self.config_manager.save_server(server_data)
-
-            # Trigger VNC connection in desktop app
-            if self.vnc_callback:
-                success = self.vnc_callback(data)
-                emit('vnc_status', {'status': 'connected' if success else 'failed'})
-            else:
-                emit('vnc_status', {'status': 'failed', 'error': 'Desktop app not available'})
-
-        @self.socketio.on('vnc_disconnect')
-        def handle_vnc_disconnect():
-            """Handle VNC disconnection request."""
-            print("VNC disconnect request")
-            if self.vnc_callback:
-                self.vnc_callback(None)  # None means disconnect
-                emit('vnc_status', {'status': 'disconnected'})
-
-        @self.socketio.on('shutdown_server')
-        def handle_shutdown_server():
-            """Handle server shutdown request."""
-            print("Server shutdown requested from web interface")
-            emit('shutdown_status', {'status': 'shutting_down'})
-
-            # Schedule shutdown after a brief delay to allow response to be sent
-            def delayed_shutdown():
-                import time
-                time.sleep(2)  # Give time for the response to be sent
-                if hasattr(self, 'shutdown_callback') and self.shutdown_callback:
-                    self.shutdown_callback()
-                else:
-                    print("No shutdown callback set, attempting system exit...")
-                    import os
-                    os._exit(0)
-
-            thread = threading.Thread(target=delayed_shutdown)
-            thread.daemon = True
-            thread.start()
+    def handle_disconnect(self, reason=None):
+        """Handle a web client disconnecting."""
+        logger.debug("Web client disconnected")
+
+    def handle_vnc_connect(self, data):
+        """Handle VNC connection request from web client."""
+        # Only the target is logged; the payload also carries the password
+        logger.info("VNC connection request for %s:%s", data.get('ip'), data.get('port'))
+
+        # Save server if requested
+        if data.get('save_server', False):
+            server_data = {
+                'ip': data['ip'],
+                'port': data['port'],
+                'username': data['username']
+            }
+            self.config_manager.save_server(server_data)
+            self._config_changed()
+
+        # Trigger VNC connection in desktop app
+        if self.vnc_callback:
+            success = self.vnc_callback(data)
+            emit('vnc_status', {'status': 'connected' if success else 'failed'})
+        else:
+            emit('vnc_status', {'status': 'failed', 'error': 'Desktop app not available'})
+
+    def handle_vnc_disconnect(self):
+        """Handle VNC disconnection request."""
+        logger.info("VNC disconnect request")
+        if self.vnc_callback:
+            self.vnc_callback(None)  # None means disconnect
+            emit('vnc_status', {'status': 'disconnected'})
+
+    def handle_shutdown_server(self, data=None):
+        """Handle server shutdown request; {'fast': true} exits without interpreter teardown."""
+        logger.info("Server shutdown requested from web interface")
+        emit('shutdown_status', {'status': 'shutting_down'})
+
+        # Schedule shutdown after a brief delay to allow response to be sent
+        # Runs on whatever task type the Socket.IO async mode uses
+        fast = isinstance(data, dict) and bool(data.get('fast'))
+        self.socketio.start_background_task(self._delayed_shutdown, fast)
+
+    def _delayed_shutdown(self, fast=False):
+        """Shut down once the shutdown_status response has had time to go out."""
+        self.socketio.sleep(2)  # Give time for the response to be sent
+        if fast:
+            # os._exit skips atexit handlers, Tk teardown and module finalization, so the
+            # state that matters is dealt with here first: unsaved config, then whatever
+            # the app registered (viewer, log listener). Tk is not thread-safe, so the
+            # GUI is left alone rather than re-shown by the disconnect handler.
+            self.config_manager.flush()
+            if self.fast_exit_callback:
+                self.fast_exit_callback()
+            os._exit(0)
+
+        if hasattr(self, 'shutdown_callback') and self.shutdown_callback:
+            self.shutdown_callback()
+        else:
+            logger.warning("No shutdown callback set, attempting system exit...")
+            os._exit(0)
 
     def notify_vnc_status(self, status):
         """Notify web clients of VNC status change."""
-        self.socketio.emit('vnc_status', {'status': status})
+        with self._status_lock:
+            flush_scheduled = self._pending_status is not None
+            self._pending_status = status
+        if not flush_scheduled:
+            self.socketio.start_background_task(self._flush_vnc_status)
+
+    def _flush_vnc_status(self):
+        """Emit the latest VNC status once the current burst of changes has settled."""
+        self.socketio.sleep(0.05)
+        with self._status_lock:
+            status = self._pending_status
+            self._pending_status = None
+        self.socketio.emit('vnc_status', {'status': status}, room='vnc_watchers')
+
+    @staticmethod
+    def _can_bind(host, port):
+        """Check with a bare bind() whether host:port is free to listen on."""
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                if os.name != 'nt':
+                    # Ignore TIME_WAIT leftovers like the real server does; on Windows this
+                    # option would let us bind over a live listener, so it stays off there
+                    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                s.bind((host, port))
+            return True
+        except OSError:
+            return False
 
     def run(self):
         """Start the web server."""
-        print("Starting VNC QR web server...")
+        logger.info("Starting VNC QR web server...")
 
         # Try different host/port combinations
         attempts = [
@@ -157,14 +267,22 @@ class WebServer:
         ]
 
         for host, port in attempts:
+            logger.debug("Trying %s:%s...", host, port)
+            # Cheap pre-check so busy ports are skipped before any server setup
+            if not self._can_bind(host, port):
+                logger.info("Failed %s:%s - address in use or unavailable", host, port)
+                continue
             try:
-                print(f"Trying {host}:{port}...")
-                self.socketio.run(self.app, host=host, port=port, debug=False,
-                                use_reloader=False, allow_unsafe_werkzeug=True)
-                break  # If successful, exit loop
-            except Exception as e:
-                print(f"Failed {host}:{port} - {e}")
+                server = make_server(host, port, self.app, threaded=True)
+            except (Exception, SystemExit) as e:  # Werkzeug exits instead of raising if the port is taken
+                logger.info("Failed %s:%s - %s", host, port, e)
                 continue
+
+            logger.info("Web server listening on %s:%s", host, port)
+            self.ready.set()
+            server.serve_forever()
+            break
         else:
-            print("ERROR: Could not start web server on any host/port combination")
-            print("Web interface will not be available")
+            logger.error("Could not start web server on any host/port combination")
+            logger.error("Web interface will not be available")
+            self.ready.set()  # Don't keep startup waiting for a server that won't come